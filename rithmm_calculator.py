@@ -3,6 +3,21 @@ import pandas as pd
 import numpy as np
 import re
 import os
+import hashlib
+import operator
+from functools import reduce
+
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+try:
+    from numba import njit
+except ImportError:
+    # Without Numba the smart bet kernel runs as plain Python.
+    def njit(*args, **kwargs):
+        return lambda func: func
 
 # ============================================================
 # CONFIGURATION & FILE PATHS
@@ -12,37 +27,123 @@ PATH_ROZIER = r"C:\Users\sarah\OneDrive\Rithmm - Adam\Python\Scripts\32529 rozie
 PATH_BIG_MONEY = r"C:\Users\sarah\OneDrive\Rithmm - Adam\Python\Scripts\32925 big money copy.xlsx"  
 PATH_HEBRON = r"C:\Users\sarah\OneDrive\Rithmm - Adam\Python\Scripts\32925 Hebron lames copy.xlsx"   
 
+# When True, each workbook is converted once to a Parquet file next to it
+# ("<path>.parquet") and read back with pyarrow, which is much faster than
+# parsing the Excel file. Set to False to always read the Excel files.
+FAST_IO = True
+
+# The preprocessed data is saved as a Parquet snapshot ("snapshot_<key>.parquet")
+# in a per-user cache directory, keyed on the path, mtime and size of every file,
+# so a restarted app can skip loading entirely.
+# Bump SNAPSHOT_VERSION whenever preprocess_data changes to ignore old snapshots.
+SNAPSHOT_VERSION = 3
+
+# Columns read from each workbook; all other columns are skipped while parsing.
+# Columns that a workbook does not have are simply absent from the result.
+USED_COLS = [
+    "bet", "bet type", "spread_type", "home/away", "home team", "away team", "game time",
+    "spread value", "rounded_spread", "pred_spread", "spread", "totals value",
+    "dtm", "roi (%)", "win probability", "bet result", "pred_total_winner"
+]
+
+# Numeric spread embedded in the "bet" text (e.g. "HOME -3.5"), compiled once.
+_SPREAD_RE = re.compile(r'(-?\d+\.?\d*)')
+
+MODEL_FILES = {
+    "Terry Rozier": PATH_ROZIER,
+    "BigMoney": PATH_BIG_MONEY,
+    "Jebron Lames": PATH_HEBRON
+}
+
 # ============================================================
-# FUNCTION: LOAD RAW DATA
+# FUNCTION: GET FILE MODIFICATION TIMES
 # ============================================================
-def load_raw_data():
-    # Check if files exist
-    file_paths = [PATH_ROZIER, PATH_BIG_MONEY, PATH_HEBRON]
+def get_file_mtimes(file_paths):
+    """
+    Check that every file exists and return their modification times.
+    The mtimes are passed to the cached loaders so an edited file invalidates the cache.
+    """
     missing_files = [path for path in file_paths if not os.path.exists(path)]
     if missing_files:
         st.error("The following file(s) were not found:\n" + "\n".join(missing_files))
         st.stop()
-    
-    files = {
-        "Terry Rozier": PATH_ROZIER,
-        "BigMoney": PATH_BIG_MONEY,
-        "Jebron Lames": PATH_HEBRON
-    }
-    
+    return tuple(os.path.getmtime(path) for path in file_paths)
+
+# ============================================================
+# FUNCTION: READ EXCEL FILE
+# ============================================================
+def read_excel_file(path):
+    """
+    Read the "in" sheet of an Excel file, parsing only USED_COLS.
+    """
+    return pd.read_excel(path, sheet_name="in", usecols=lambda c: c in USED_COLS)
+
+# ============================================================
+# FUNCTION: CONVERT EXCEL TO PARQUET
+# ============================================================
+def convert_excel_to_parquet(path):
+    """
+    One-shot migration: read the "in" sheet of an Excel file and save it as "<path>.parquet".
+    Returns the DataFrame that was read.
+    """
+    df = read_excel_file(path)
+    try:
+        df.to_parquet(path + ".parquet", engine="pyarrow")
+    except Exception as e:
+        # The Excel data is still usable; it will be converted again on the next load.
+        st.warning(f"Could not save Parquet copy of {path}:\n{e}")
+    return df
+
+# ============================================================
+# FUNCTION: READ MODEL FILE
+# ============================================================
+@st.cache_data(show_spinner=False)
+def read_model_file(path, mtime):
+    """
+    Read the "in" sheet of a model file.
+    With FAST_IO, use the Parquet copy if it is at least as new as the Excel file;
+    otherwise convert the Excel file first.
+    Cached per file: mtime is only part of the cache key, so editing one file
+    re-reads that file alone.
+    """
+    if not FAST_IO:
+        return read_excel_file(path)
+    parquet_path = path + ".parquet"
+    if os.path.exists(parquet_path) and os.path.getmtime(parquet_path) >= os.path.getmtime(path):
+        df = pd.read_parquet(parquet_path, engine="pyarrow")
+        # Parquet copies written by older versions of this script hold every column.
+        return df[[c for c in df.columns if c in USED_COLS]]
+    return convert_excel_to_parquet(path)
+
+# ============================================================
+# FUNCTION: LOAD RAW DATA
+# ============================================================
+def load_raw_data(files, mtimes):
+    """
+    Load the "in" sheet of every (model, path) pair in files.
+    mtimes holds the modification time of each file, in the same order.
+    Returns the combined DataFrame and the list of models whose file failed to load.
+    """
+    model_names = sorted(model for model, _ in files)
     frames = []
-    for model, path in files.items():
+    failed_models = []
+    for (model, path), mtime in zip(files, mtimes):
         try:
-            df = pd.read_excel(path, sheet_name="in")
+            df = read_model_file(path, mtime)
         except Exception as e:
             st.error(f"Error loading file for {model} from {path}:\n{e}")
+            failed_models.append(model)
             continue
-        # Force the model name to be exactly the model string
-        df["model name"] = model
+        # Force the model name to be exactly the model string, stored as a category
+        # shared by all files so the concatenated column stays categorical.
+        df["model name"] = pd.Categorical.from_codes(
+            np.full(len(df), model_names.index(model), dtype=np.int8), categories=model_names
+        )
         frames.append(df)
     
     if frames:
         combined = pd.concat(frames, ignore_index=True)
-        return combined
+        return combined, failed_models
     else:
         st.error("No raw data could be loaded.")
         st.stop()
@@ -58,11 +159,17 @@ def preprocess_data(df):
             * If "bet" column exists, infer "Home" if "HOME" is in the text,
               "Away" if "AWAY" is in the text, else "Both".
             * Otherwise, if "home team" exists, default to "Home"; else "Both".
+        An existing "home/away" column is mapped to "Home"/"Away"/"Both" the same way.
+      - Create a categorical "totals outcome" column ("Over", "Under" or "") from
+        "pred_total_winner" if available, else from the "bet" column.
       - Auto-detect a spread column among: "spread value", "rounded_spread", "pred_spread", "spread".
         Use that column (if found) to create a new column "auto_spread". If none is found, try to extract a numeric value from the "bet" column.
         Rows with auto_spread == 0 are considered non-spread bets.
       - Ensure that "dtm" and "roi (%)" exist (defaulting to 0).
-      - Convert "win probability" to numeric and "bet result" to string.
+      - Convert "win probability", "auto_spread", "dtm" and "roi (%)" to numeric (float64),
+        and "bet result" to string.
+      - Add a boolean "is_win" column (True where "bet result" is "WIN").
+      - Store "bet result", "home/away" and "bet type" as categories.
     """
     if "bet type" not in df.columns:
         if "spread_type" in df.columns:
@@ -70,21 +177,41 @@ def preprocess_data(df):
         else:
             df["bet type"] = "Favorite Spreads"
     
-    if "home/away" not in df.columns:
-        if "bet" in df.columns:
-            def infer_home_away(x):
-                x = str(x).upper()
-                if "HOME" in x:
-                    return "Home"
-                elif "AWAY" in x:
-                    return "Away"
-                else:
-                    return "Both"
-            df["home/away"] = df["bet"].apply(infer_home_away)
-        elif "home team" in df.columns:
-            df["home/away"] = "Home"
-        else:
-            df["home/away"] = "Both"
+    # Uppercase the bet text once; it is shared by the home/away and totals inference below.
+    bet_upper = df["bet"].astype(str).str.upper() if "bet" in df.columns else None
+    
+    # An existing "home/away" column is mapped the same way as the "bet" text,
+    # so values like "Home team" still count as Home.
+    if "home/away" in df.columns:
+        home_away_upper = df["home/away"].astype(str).str.upper()
+    else:
+        home_away_upper = bet_upper
+    if home_away_upper is not None:
+        df["home/away"] = np.select(
+            [home_away_upper.str.contains("HOME", regex=False, na=False),
+             home_away_upper.str.contains("AWAY", regex=False, na=False)],
+            ["Home", "Away"],
+            default="Both"
+        )
+    elif "home team" in df.columns:
+        df["home/away"] = "Home"
+    else:
+        df["home/away"] = "Both"
+    
+    # Normalize the totals side once so the Totals Outcome filter is a plain equality.
+    if "pred_total_winner" in df.columns:
+        totals_upper = df["pred_total_winner"].astype(str).str.upper()
+    else:
+        totals_upper = bet_upper
+    if totals_upper is not None:
+        df["totals outcome"] = pd.Categorical(
+            np.select(
+                [totals_upper.str.contains("OVER", regex=False, na=False),
+                 totals_upper.str.contains("UNDER", regex=False, na=False)],
+                ["Over", "Under"],
+                default=""
+            )
+        )
     
     # Auto-detect a spread column.
     spread_candidates = ["spread value", "rounded_spread", "pred_spread", "spread"]
@@ -98,15 +225,10 @@ def preprocess_data(df):
     else:
         st.warning("No recognized spread column found. Attempting to extract numeric spread from 'bet' column.")
         if "bet" in df.columns:
-            def extract_spread(text):
-                m = re.search(r'(-?\d+\.?\d*)', str(text))
-                if m:
-                    try:
-                        return float(m.group(1))
-                    except:
-                        return 0.0
-                return 0.0
-            df["auto_spread"] = df["bet"].apply(extract_spread)
+            df["auto_spread"] = pd.to_numeric(
+                df["bet"].astype(str).str.extract(_SPREAD_RE, expand=False),
+                errors='coerce'
+            ).fillna(0.0)
         else:
             df["auto_spread"] = 0.0
     
@@ -116,16 +238,235 @@ def preprocess_data(df):
     
     if "win probability" in df.columns:
         df["win probability"] = pd.to_numeric(df["win probability"], errors='coerce').fillna(0.0)
+    # Text cells in the numeric filter columns become NaN (0 for auto_spread, i.e. not a
+    # spread bet). They stay float64: float32 would move values within one float32 step
+    # of an integer slider bound to the other side.
+    df["auto_spread"] = pd.to_numeric(df["auto_spread"], errors='coerce').fillna(0.0)
+    for col in ["dtm", "roi (%)"]:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
     if "bet result" in df.columns:
         df["bet result"] = df["bet result"].astype(str)
+    # Precompute the win flag once so each rerun only has to sum it.
+    df["is_win"] = (df["bet result"] == "WIN") if "bet result" in df.columns else False
+    
+    # Low-cardinality text columns are stored as categories (small integer codes),
+    # which makes equality filters and groupby much cheaper than on strings.
+    for col in ["bet result", "home/away", "bet type"]:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
     
     return df
 
+# ============================================================
+# FUNCTION: GET SNAPSHOT DIRECTORY
+# ============================================================
+def get_snapshot_dir():
+    """
+    Return the per-user directory that holds the data snapshots, creating it if needed.
+    This is %LOCALAPPDATA%\\rithmm_calculator on Windows and ~/.cache/rithmm_calculator
+    (or $XDG_CACHE_HOME/rithmm_calculator) elsewhere.
+    """
+    base_dir = (
+        os.environ.get("LOCALAPPDATA")
+        or os.environ.get("XDG_CACHE_HOME")
+        or os.path.join(os.path.expanduser("~"), ".cache")
+    )
+    snapshot_dir = os.path.join(base_dir, "rithmm_calculator")
+    os.makedirs(snapshot_dir, exist_ok=True)
+    return snapshot_dir
+
+# ============================================================
+# FUNCTION: LOAD DATA
+# ============================================================
+def load_data(files, mtimes):
+    """
+    Load and preprocess the data for the (model, path) pairs in files.
+    Reuses the Parquet snapshot of a previous run when no file has changed;
+    otherwise rebuilds the data and, if every file loaded, writes a new snapshot
+    in place of the old ones.
+    Returns the data and the list of models whose file failed to load.
+    """
+    signature = (SNAPSHOT_VERSION, files, tuple((os.path.getmtime(path), os.path.getsize(path)) for _, path in files))
+    digest = hashlib.sha1(repr(signature).encode()).hexdigest()
+    try:
+        snapshot_dir = get_snapshot_dir()
+    except OSError:
+        snapshot_dir = None
+    if snapshot_dir is not None:
+        snapshot_path = os.path.join(snapshot_dir, f"snapshot_{digest}.parquet")
+        if os.path.exists(snapshot_path):
+            try:
+                return pd.read_parquet(snapshot_path, engine="pyarrow"), []
+            except Exception:
+                # A corrupt or incompatible snapshot is rebuilt below.
+                pass
+    
+    raw_data, failed_models = load_raw_data(files, mtimes)
+    data = preprocess_data(raw_data)
+    if failed_models or snapshot_dir is None:
+        # Don't snapshot partial data: it would keep being served after the
+        # failing file is fixed, since the snapshot key only covers the workbooks.
+        return data, failed_models
+    try:
+        # The directory is dedicated to this app, so only its own snapshots match.
+        for name in os.listdir(snapshot_dir):
+            if name.startswith("snapshot_") and name.endswith(".parquet"):
+                os.remove(os.path.join(snapshot_dir, name))
+        data.to_parquet(snapshot_path, engine="pyarrow")
+    except Exception:
+        # Without a snapshot the data is simply rebuilt on the next start.
+        pass
+    return data, failed_models
+
+# ============================================================
+# FUNCTION: PARTITION DATA BY MODEL
+# ============================================================
+@st.cache_resource(show_spinner=False)
+def partition_by_model(files, mtimes):
+    """
+    Load the data and split it into one DataFrame per model name, so selecting
+    a model is a dictionary lookup instead of a scan over every row.
+    When Polars is installed the partitions are Polars DataFrames, which
+    filter_data queries lazily; otherwise they are pandas DataFrames.
+    Cached as a resource on (files, mtimes): a rerun gets the same dict back
+    without hashing or copying the data, so the partitions must not be modified.
+    This is the only in-memory cache of the loaded data: load_data, load_raw_data
+    and preprocess_data only run when it misses.
+    Returns the partitions and the list of models whose file failed to load.
+    """
+    df, failed_models = load_data(files, mtimes)
+    partitions = {m: g.reset_index(drop=True) for m, g in df.groupby("model name", sort=False, observed=True)}
+    if pl is not None:
+        partitions = {m: pl.from_pandas(g) for m, g in partitions.items()}
+    return partitions, failed_models
+
+# ============================================================
+# FUNCTION: BUILD FILTER CONDITIONS
+# ============================================================
+def build_conditions(columns, bet_type, home_away, spread_outcome, totals_outcome, fav_underdog,
+                     win_prob_range, dtm_range):
+    """
+    Translate the user's selections into a list of (column, comparison, value)
+    conditions, where comparison is a function from the operator module.
+    columns is the list of available data columns.
+    """
+    conditions = []
+
+    # 1) Filter by Model: the data is already partitioned by model name,
+    #    so filter_data starts from the selected model's partition instead.
+
+    # 2) Filter by Bet Type.
+    if bet_type == "OutcomeSpreadWin":
+        # Include only rows where auto_spread is nonzero.
+        conditions.append(("auto_spread", operator.ne, 0))
+    elif bet_type == "OutcomeOverWin":
+        # For totals bets, we don't filter by bet type directly.
+        pass
+    elif bet_type == "OutcomeMoneylineWin":
+        # We'll handle moneyline filtering below.
+        pass
+    else:
+        conditions.append(("bet type", operator.eq, bet_type))
+
+    # 3) Filter by Home/Away (if applicable).
+    if bet_type != "OutcomeOverWin" and home_away != "Both":
+        conditions.append(("home/away", operator.eq, home_away))
+
+    # 4) For OutcomeSpreadWin, apply the Spread Outcome filter.
+    if bet_type == "OutcomeSpreadWin" and spread_outcome is not None:
+        if spread_outcome == "Favorite":
+            conditions.append(("auto_spread", operator.lt, 0))
+        elif spread_outcome == "Underdog":
+            conditions.append(("auto_spread", operator.gt, 0))
+        # "Both" means no additional filtering.
+
+    # 5) For OutcomeOverWin, apply Totals Outcome filter.
+    if bet_type == "OutcomeOverWin" and totals_outcome is not None:
+        if "totals outcome" in columns:
+            conditions.append(("totals outcome", operator.eq, totals_outcome))
+
+    # 6) For OutcomeMoneylineWin, apply custom filtering.
+    if bet_type == "OutcomeMoneylineWin" and fav_underdog is not None:
+        if fav_underdog == "Favorite":
+            conditions.append(("win probability", operator.gt, 50))
+        else:
+            conditions.append(("win probability", operator.le, 50))
+
+    # 7) Apply Win Probability Range filter.
+    if "win probability" in columns:
+        conditions.append(("win probability", operator.ge, win_prob_range[0]))
+        conditions.append(("win probability", operator.le, win_prob_range[1]))
+
+    # 8) Apply DTM Range filter.
+    if "dtm" in columns:
+        conditions.append(("dtm", operator.ge, dtm_range[0]))
+        conditions.append(("dtm", operator.le, dtm_range[1]))
+    
+    return conditions
+
+# ============================================================
+# FUNCTION: FILTER DATA
+# ============================================================
+def filter_data(model, conditions, data_by_model):
+    """
+    Return the rows of the given model's partition that satisfy every condition,
+    as a pandas DataFrame. The conditions are evaluated in one pass: as a Polars
+    lazy query when Polars is installed, otherwise as a single NumPy boolean mask.
+    """
+    model_data = data_by_model[model]
+    if pl is not None:
+        predicate = reduce(
+            operator.and_,
+            [op(pl.col(col), value) for col, op, value in conditions],
+            pl.lit(True)
+        )
+        return model_data.lazy().filter(predicate).collect().to_pandas()
+    mask = np.ones(len(model_data), dtype=bool)
+    for col, op, value in conditions:
+        mask &= op(model_data[col].values, value)
+    # Reset the index so both paths return the same frame.
+    return model_data[mask].reset_index(drop=True)
+
+# ============================================================
+# FUNCTION: SMART BET KERNEL
+# ============================================================
+# Integer codes used by smart_bet_kernel.
+BET_TYPE_CODES = {"OutcomeSpreadWin": 0, "OutcomeMoneylineWin": 1, "OutcomeOverWin": 2}
+FAV_UNDERDOG_CODES = {None: 0, "Favorite": 1, "Underdog": 2}
+
+# Compiled without parallel=True: Streamlit runs each session's script in its
+# own thread, and Numba's default threading layer is not safe to call from
+# several threads at once.
+@njit(cache=True)
+def smart_bet_kernel(win_pct, tot, roi, bt_code, fav_code, out):
+    """
+    Evaluate the smart bet rules (see SMART BET LOGIC) for many bet
+    combinations at once. Element i of out is set to True if combination i
+    (win percentage, total bets, mean ROI, bet type code, favorite/underdog code)
+    is a smart bet. Compiled with Numba when it is installed.
+    """
+    for i in range(win_pct.shape[0]):
+        w = win_pct[i]
+        n = tot[i]
+        r = roi[i]
+        spread_or_totals = (bt_code[i] == 0) | (bt_code[i] == 2)
+        record_ok = ((n >= 10) & (w >= 60)) | ((n >= 4) & (n < 10) & (w >= 70))
+        underdog_ok = (fav_code[i] == 2) & ((w >= 50) | (r >= 10))
+        favorite_ok = (fav_code[i] == 1) & ((w >= 65) | (r >= 10))
+        out[i] = (spread_or_totals & record_ok) | ((bt_code[i] == 1) & (underdog_ok | favorite_ok))
+
 # ============================================================
 # LOAD & PREPROCESS DATA
 # ============================================================
-data = load_raw_data()
-data = preprocess_data(data)
+model_files = tuple(MODEL_FILES.items())
+file_mtimes = get_file_mtimes([path for _, path in model_files])
+data_by_model, failed_models = partition_by_model(model_files, file_mtimes)
+if failed_models:
+    # Don't keep partial data cached: the failed files (e.g. locked by Excel or
+    # a sync) are read again on the next rerun, as the error above reports.
+    partition_by_model.clear()
+# Every partition has the columns of the full data.
+data_columns = next(iter(data_by_model.values())).columns
 
 # ============================================================
 # STREAMLIT APP: USER INPUTS
@@ -134,8 +475,9 @@ st.title("Rithmm Calculator")
 
 include_spread = st.checkbox("Include Spread in Calculation", value=True)
 
-# Model filter.
-model = st.selectbox("Model Name", options=sorted(data["model name"].unique()))
+# Model filter. Only models with a partition are listed (a model whose file failed to load has none).
+model_options = sorted(data_by_model)
+model = st.selectbox("Model Name", options=model_options)
 
 # Bet Type filter.
 # Options: OutcomeSpreadWin, OutcomeMoneylineWin, OutcomeOverWin.
@@ -175,73 +517,17 @@ st.markdown("---")
 # ============================================================
 # DATA FILTERING
 # ============================================================
-filtered_data = data.copy()
-
-# 1) Filter by Model.
-filtered_data = filtered_data[filtered_data["model name"] == model]
-
-# 2) Filter by Bet Type.
-if bet_type == "OutcomeSpreadWin":
-    # Include only rows where auto_spread is nonzero.
-    filtered_data = filtered_data[filtered_data["auto_spread"] != 0]
-elif bet_type == "OutcomeOverWin":
-    # For totals bets, we don't filter by bet type directly.
-    pass
-elif bet_type == "OutcomeMoneylineWin":
-    # We'll handle moneyline filtering below.
-    pass
-else:
-    filtered_data = filtered_data[filtered_data["bet type"] == bet_type]
-
-# 3) Filter by Home/Away (if applicable).
-if bet_type != "OutcomeOverWin" and home_away != "Both":
-    filtered_data = filtered_data[filtered_data["home/away"].str.contains(home_away, case=False, na=False)]
-
-# 4) For OutcomeSpreadWin, apply the Spread Outcome filter.
-if bet_type == "OutcomeSpreadWin" and spread_outcome is not None:
-    if spread_outcome == "Favorite":
-        filtered_data = filtered_data[filtered_data["auto_spread"] < 0]
-    elif spread_outcome == "Underdog":
-        filtered_data = filtered_data[filtered_data["auto_spread"] > 0]
-    # "Both" means no additional filtering.
-
-# 5) For OutcomeOverWin, apply Totals Outcome filter.
-if bet_type == "OutcomeOverWin" and totals_outcome is not None:
-    if "pred_total_winner" in filtered_data.columns:
-        filtered_data = filtered_data[filtered_data["pred_total_winner"].str.contains(totals_outcome, case=False, na=False)]
-    elif "bet" in filtered_data.columns:
-        filtered_data = filtered_data[filtered_data["bet"].str.contains(totals_outcome, case=False, na=False)]
-
-# 6) For OutcomeMoneylineWin, apply custom filtering.
-if bet_type == "OutcomeMoneylineWin" and fav_underdog is not None:
-    if fav_underdog == "Favorite":
-        filtered_data = filtered_data[filtered_data["win probability"] > 50]
-    else:
-        filtered_data = filtered_data[filtered_data["win probability"] <= 50]
-
-# 7) Apply Win Probability Range filter.
-if "win probability" in filtered_data.columns:
-    filtered_data = filtered_data[
-        (filtered_data["win probability"] >= win_prob_range[0]) &
-        (filtered_data["win probability"] <= win_prob_range[1])
-    ]
-
-# 8) Apply DTM Range filter.
-if "dtm" in filtered_data.columns:
-    filtered_data = filtered_data[
-        (filtered_data["dtm"] >= dtm_range[0]) &
-        (filtered_data["dtm"] <= dtm_range[1])
-    ]
-
-# 9) If not including spread, force auto_spread to 0.
-if not include_spread:
-    filtered_data["auto_spread"] = 0.0
+conditions = build_conditions(
+    data_columns, bet_type, home_away, spread_outcome, totals_outcome, fav_underdog, win_prob_range, dtm_range
+)
+filtered_data = filter_data(model, conditions, data_by_model)
 
 # ============================================================
 # CALCULATE METRICS
 # ============================================================
-total_bets = len(filtered_data)
-total_wins = filtered_data["bet result"].value_counts().get("WIN", 0)
+wins_mask = filtered_data["is_win"].values
+total_bets = wins_mask.size
+total_wins = int(np.count_nonzero(wins_mask))
 total_losses = total_bets - total_wins
 win_percentage = (total_wins / total_bets * 100) if total_bets > 0 else 0
 
@@ -273,11 +559,65 @@ if is_smart_bet:
 else:
     st.info("Not a Smart Bet")
 
+# ============================================================
+# SMART BET SCAN (OPTIONAL)
+# ============================================================
+# Evaluate every Bet Type / outcome / Home/Away combination for the selected
+# model and ranges, and list the ones that qualify as smart bets.
+if st.checkbox("Scan All Combinations for Smart Bets"):
+    scan_options = {
+        "OutcomeSpreadWin": ["Favorite", "Underdog", "Both"],
+        "OutcomeMoneylineWin": ["Favorite", "Underdog"],
+        "OutcomeOverWin": ["Over", "Under"],
+    }
+    combos = []
+    for scan_bet_type, outcomes in scan_options.items():
+        scan_home_away = ["Both"] if scan_bet_type == "OutcomeOverWin" else ["Home", "Away", "Both"]
+        for outcome in outcomes:
+            for scan_ha in scan_home_away:
+                scan_fav = outcome if scan_bet_type == "OutcomeMoneylineWin" else None
+                scan_conditions = build_conditions(
+                    data_columns, scan_bet_type, scan_ha,
+                    outcome if scan_bet_type == "OutcomeSpreadWin" else None,
+                    outcome if scan_bet_type == "OutcomeOverWin" else None,
+                    scan_fav, win_prob_range, dtm_range
+                )
+                scan_data = filter_data(model, scan_conditions, data_by_model)
+                scan_wins = scan_data["is_win"].values
+                combos.append({
+                    "Bet Type": scan_bet_type,
+                    "Outcome": outcome,
+                    "Home/Away": scan_ha,
+                    "Total Bets": scan_wins.size,
+                    "Win Percentage": (np.count_nonzero(scan_wins) / scan_wins.size * 100) if scan_wins.size > 0 else 0.0,
+                    "Mean ROI (%)": float(scan_data["roi (%)"].mean()),
+                    "bet type code": BET_TYPE_CODES[scan_bet_type],
+                    "fav code": FAV_UNDERDOG_CODES[scan_fav],
+                })
+    scan = pd.DataFrame(combos)
+    smart = np.zeros(len(scan), dtype=np.bool_)
+    smart_bet_kernel(
+        scan["Win Percentage"].to_numpy(dtype=np.float64),
+        scan["Total Bets"].to_numpy(dtype=np.int64),
+        scan["Mean ROI (%)"].to_numpy(dtype=np.float64),
+        scan["bet type code"].to_numpy(dtype=np.int64),
+        scan["fav code"].to_numpy(dtype=np.int64),
+        smart
+    )
+    smart_bets = scan[smart].drop(columns=["bet type code", "fav code"])
+    if smart_bets.empty:
+        st.info("No smart bets found for this model and range.")
+    else:
+        st.dataframe(smart_bets.sort_values("Win Percentage", ascending=False), hide_index=True)
+
 # ============================================================
 # OUTPUT FILTERED DATA (OPTIONAL)
 # ============================================================
 if st.checkbox("Show Filtered Data"):
-    st.dataframe(filtered_data)
+    # Hide the helper columns added by preprocess_data.
+    display_data = filtered_data.drop(columns=["is_win", "totals outcome"], errors="ignore")
+    # If not including spread, show auto_spread as 0 (display only; the data is not modified).
+    st.dataframe(display_data if include_spread else display_data.assign(auto_spread=0.0))
 
 st.markdown("---")
 st.info("""